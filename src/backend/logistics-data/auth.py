@@ -20,9 +20,8 @@ from typing import Any
 import httpx
 import jwt
 from cachetools import TTLCache
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
 
 logger = logging.getLogger(__name__)
 
@@ -44,6 +43,12 @@ PUBLIC_PATHS = {
 # Cache for JWKS keys (1 hour TTL, max 10 keys)
 _jwks_cache: TTLCache = TTLCache(maxsize=10, ttl=3600)
 
+# Shared HTTP client for JWKS fetches so refreshes reuse pooled keep-alive
+# connections (and TLS sessions) instead of reconnecting on every cache miss.
+# Created on first use and closed via close_jwks_client() from the app lifespan;
+# the next fetch after shutdown (e.g. a restarted lifespan) builds a new one.
+_jwks_http_client: httpx.AsyncClient | None = None
+
 
 # ============================================================================
 # JWKS Fetching and Caching
@@ -60,26 +65,45 @@ def get_openid_config_uri(tenant_id: str) -> str:
     return f"https://login.microsoftonline.com/{tenant_id}/v2.0/.well-known/openid-configuration"
 
 
-def fetch_jwks(tenant_id: str) -> dict[str, Any]:
+async def fetch_jwks(tenant_id: str) -> dict[str, Any]:
     """Fetch JWKS from Azure AD, with caching."""
     cache_key = f"jwks:{tenant_id}"
 
-    if cache_key in _jwks_cache:
-        return _jwks_cache[cache_key]
+    cached = _jwks_cache.get(cache_key)
+    if cached is not None:
+        return cached
 
     jwks_uri = get_jwks_uri(tenant_id)
     logger.info(f"Fetching JWKS from {jwks_uri}")
 
-    with httpx.Client(timeout=10.0) as client:
-        response = client.get(jwks_uri)
-        response.raise_for_status()
-        jwks = response.json()
+    response = await _get_jwks_http_client().get(jwks_uri)
+    response.raise_for_status()
+    jwks = response.json()
 
     _jwks_cache[cache_key] = jwks
     return jwks
 
 
-def get_signing_key(token: str, tenant_id: str) -> dict[str, Any]:
+def _get_jwks_http_client() -> httpx.AsyncClient:
+    """Return the shared JWKS HTTP client, creating it if missing or closed."""
+    global _jwks_http_client
+    if _jwks_http_client is None or _jwks_http_client.is_closed:
+        _jwks_http_client = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=4),
+        )
+    return _jwks_http_client
+
+
+async def close_jwks_client() -> None:
+    """Close the shared JWKS HTTP client (call on application shutdown)."""
+    global _jwks_http_client
+    client, _jwks_http_client = _jwks_http_client, None
+    if client is not None:
+        await client.aclose()
+
+
+async def get_signing_key(token: str, tenant_id: str) -> dict[str, Any]:
     """Get the signing key for a JWT token from JWKS."""
     # Decode header without verification to get the key ID
     unverified_header = jwt.get_unverified_header(token)
@@ -89,7 +113,7 @@ def get_signing_key(token: str, tenant_id: str) -> dict[str, Any]:
         raise jwt.InvalidTokenError("Token header missing 'kid' claim")
 
     # Fetch JWKS and find the matching key
-    jwks = fetch_jwks(tenant_id)
+    jwks = await fetch_jwks(tenant_id)
 
     for key in jwks.get("keys", []):
         if key.get("kid") == kid:
@@ -97,9 +121,8 @@ def get_signing_key(token: str, tenant_id: str) -> dict[str, Any]:
 
     # Key not found - maybe JWKS was rotated, clear cache and retry
     cache_key = f"jwks:{tenant_id}"
-    if cache_key in _jwks_cache:
-        del _jwks_cache[cache_key]
-        jwks = fetch_jwks(tenant_id)
+    if _jwks_cache.pop(cache_key, None) is not None:
+        jwks = await fetch_jwks(tenant_id)
         for key in jwks.get("keys", []):
             if key.get("kid") == kid:
                 return key
@@ -112,7 +135,7 @@ def get_signing_key(token: str, tenant_id: str) -> dict[str, Any]:
 # ============================================================================
 
 
-def validate_token(token: str) -> dict[str, Any]:
+async def validate_token(token: str) -> dict[str, Any]:
     """
     Validate a JWT token issued by Azure AD.
 
@@ -129,7 +152,7 @@ def validate_token(token: str) -> dict[str, Any]:
         raise jwt.InvalidTokenError("Azure AD not configured")
 
     # Get the signing key
-    signing_key_data = get_signing_key(token, AZURE_AD_TENANT_ID)
+    signing_key_data = await get_signing_key(token, AZURE_AD_TENANT_ID)
 
     # Build the public key from JWK
     from jwt import algorithms
@@ -174,46 +197,83 @@ def validate_token(token: str) -> dict[str, Any]:
 # ============================================================================
 
 
-class EntraIDAuthMiddleware(BaseHTTPMiddleware):
+def _unauthorized(message: str) -> JSONResponse:
+    """Build a 401 JSON response with a Bearer challenge."""
+    return JSONResponse(
+        status_code=401,
+        content={"error": message},
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+# Fixed rejection responses are rendered once at import and reused; Response
+# objects are not mutated when sent, so sharing them across requests is safe.
+_MISSING_AUTH_HEADER = _unauthorized("Missing Authorization header")
+_INVALID_AUTH_HEADER = _unauthorized(
+    "Invalid Authorization header format. Expected: Bearer <token>"
+)
+_TOKEN_EXPIRED = _unauthorized("Token has expired")
+_INVALID_AUDIENCE = _unauthorized("Invalid token audience")
+_INVALID_ISSUER = _unauthorized("Invalid token issuer")
+_AUTH_ERROR = JSONResponse(status_code=500, content={"error": "Authentication error"})
+
+
+class EntraIDAuthMiddleware:
     """
-    Starlette middleware for Azure AD (Entra ID) authentication.
+    ASGI middleware for Azure AD (Entra ID) authentication.
 
     This middleware validates JWT tokens on incoming requests and rejects
-    unauthenticated requests to protected endpoints.
+    unauthenticated requests to protected endpoints. It is implemented as a
+    plain ASGI callable rather than BaseHTTPMiddleware so allowed requests are
+    passed straight through without an extra task and response-streaming hop.
     """
 
-    async def dispatch(self, request: Request, call_next):
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
         # Normalize path
-        path = request.url.path.rstrip("/") or "/"
+        path = scope["path"].rstrip("/") or "/"
+        method = scope["method"]
 
         # Skip auth for public paths
         if path in PUBLIC_PATHS:
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
         # Skip auth for OPTIONS (CORS preflight)
-        if request.method == "OPTIONS":
-            return await call_next(request)
+        if method == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
 
         # Skip if auth is not enabled
         if not AUTH_ENABLED:
             logger.debug("Authentication not enabled - allowing unauthenticated request")
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
         # Skip if not configured (but auth is enabled - log warning)
         if not AZURE_AD_TENANT_ID or not AZURE_AD_CLIENT_ID:
             logger.warning(
                 "AUTH_ENABLED=true but Azure AD not configured - allowing request without validation"
             )
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
 
         # Get Authorization header
-        auth_header = request.headers.get("Authorization")
+        auth_header = None
+        for name, value in scope["headers"]:
+            if name == b"authorization":
+                auth_header = value.decode("latin-1")
+                break
+
         if not auth_header:
-            return JSONResponse(
-                status_code=401,
-                content={"error": "Missing Authorization header"},
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+            await _MISSING_AUTH_HEADER(scope, receive, send)
+            return
 
         # Extract token
         try:
@@ -221,59 +281,46 @@ class EntraIDAuthMiddleware(BaseHTTPMiddleware):
             if scheme.lower() != "bearer":
                 raise ValueError("Invalid scheme")
         except ValueError:
-            return JSONResponse(
-                status_code=401,
-                content={"error": "Invalid Authorization header format. Expected: Bearer <token>"},
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+            await _INVALID_AUTH_HEADER(scope, receive, send)
+            return
 
         # Validate token
         try:
-            payload = validate_token(token)
+            payload = await validate_token(token)
             # Store user info in request state
-            request.state.user = payload
-            request.state.user_id = payload.get("oid") or payload.get("sub")
-            request.state.user_name = payload.get("name") or payload.get("preferred_username")
+            state = scope.setdefault("state", {})
+            state["user"] = payload
+            state["user_id"] = payload.get("oid") or payload.get("sub")
+            state["user_name"] = payload.get("name") or payload.get("preferred_username")
 
             # Log access info (single line: appid, upn, name)
-            appid = payload.get("appid", "unknown")
-            upn = payload.get("upn", payload.get("unique_name", "unknown"))
-            name = payload.get("name", "unknown")
-            logger.info(f"ACCESS: {request.method} {path} | app={appid} upn={upn} name={name}")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(
+                    "ACCESS: %s %s | app=%s upn=%s name=%s",
+                    method,
+                    path,
+                    payload.get("appid", "unknown"),
+                    payload.get("upn", payload.get("unique_name", "unknown")),
+                    payload.get("name", "unknown"),
+                )
 
         except jwt.ExpiredSignatureError:
-            return JSONResponse(
-                status_code=401,
-                content={"error": "Token has expired"},
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+            response = _TOKEN_EXPIRED
         except jwt.InvalidAudienceError:
-            return JSONResponse(
-                status_code=401,
-                content={"error": "Invalid token audience"},
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+            response = _INVALID_AUDIENCE
         except jwt.InvalidIssuerError:
-            return JSONResponse(
-                status_code=401,
-                content={"error": "Invalid token issuer"},
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+            response = _INVALID_ISSUER
         except jwt.InvalidTokenError as e:
             logger.error(f"Token validation failed: {e}")
-            return JSONResponse(
-                status_code=401,
-                content={"error": f"Invalid token: {str(e)}"},
-                headers={"WWW-Authenticate": "Bearer"},
-            )
+            response = _unauthorized(f"Invalid token: {str(e)}")
         except Exception as e:
             logger.error(f"Unexpected auth error: {e}", exc_info=True)
-            return JSONResponse(
-                status_code=500,
-                content={"error": "Authentication error"},
-            )
+            response = _AUTH_ERROR
+        else:
+            await self.app(scope, receive, send)
+            return
 
-        return await call_next(request)
+        await response(scope, receive, send)
 
 
 def is_auth_enabled() -> bool:
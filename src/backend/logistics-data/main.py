@@ -34,17 +34,22 @@ from __future__ import annotations
 import json
 import logging
 import os
+from bisect import bisect_left
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
 import duckdb
 from dotenv import load_dotenv
 from starlette.applications import Starlette
+from starlette.middleware import Middleware
 from starlette.requests import Request
 from starlette.responses import JSONResponse
-from starlette.routing import Route
+from starlette.routing import Mount, Route
 
-from auth import EntraIDAuthMiddleware, is_auth_enabled
+from auth import EntraIDAuthMiddleware, close_jwks_client, is_auth_enabled
 
 load_dotenv()
 
@@ -62,12 +67,40 @@ FLIGHTS_FILE = DATA_DIR / "flights.json"
 ONEVIEW_FILE = DATA_DIR / "oneview.json"
 UTILIZATION_FILE = DATA_DIR / "utilization.json"
 
-# Historical data cache (loaded from flights.json)
-_HISTORICAL_DATA_CACHE: list = []
+# DuckDB database location. ":memory:" rebuilds tables from JSON on every start;
+# a file path persists them and skips the reload while the JSON files are unchanged.
+MCP_DB_PATH = os.getenv("MCP_DB_PATH", ":memory:")
+
+# Pinned element type of flights.json's "flights" array, so the table keeps its
+# DATE/TIME columns for SQL callers instead of depending on type inference. The
+# REST projection (_FLIGHT_COLUMNS) formats them back to strings.
+_FLIGHTS_JSON_TYPE = (
+    'STRUCT(id VARCHAR, flightNumber VARCHAR, flightDate DATE, "from" VARCHAR, '
+    '"to" VARCHAR, currentPounds BIGINT, maxPounds BIGINT, currentCubicFeet BIGINT, '
+    "maxCubicFeet BIGINT, utilizationPercent DOUBLE, riskLevel VARCHAR, sortTime TIME)[]"
+)
+
+# Bumped whenever the table layout changes so persisted databases are rebuilt
+_TABLE_LAYOUT_VERSION = 3
 
 # Cache for flight data (used by REST endpoints)
 _FLIGHT_DATA_CACHE: dict = {}
 
+# Lookup indices over _FLIGHT_DATA_CACHE["flights"] for get_flight_by_id
+_FLIGHT_BY_ID: dict[str, dict] = {}
+_FLIGHT_BY_NUMBER: dict[str, dict] = {}
+
+# Aggregates over the loaded tables; the data does not change while the process runs
+_SUMMARY_CACHE: dict = {}
+_ROUTES_CACHE: dict = {}
+
+
+def _json_default(value: Any) -> Any:
+    """Serialize DuckDB values json can't handle natively (dates, times, timestamps)."""
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
 
 class LogisticsMCP:
     """MCP server for logistics flight data using DuckDB."""
@@ -79,22 +112,65 @@ class LogisticsMCP:
         """Initialize the DuckDB connection with flight data."""
         self._get_connection()
 
+    def get_connection(self) -> duckdb.DuckDBPyConnection:
+        """Get the shared DuckDB connection, loading the tables on first use."""
+        return self._get_connection()
+
     def _get_connection(self) -> duckdb.DuckDBPyConnection:
         """Get or create the DuckDB connection with loaded data."""
         if self._duckdb_conn is not None:
             return self._duckdb_conn
 
+        conn = duckdb.connect(MCP_DB_PATH)
+        self._duckdb_conn = conn
+        if MCP_DB_PATH != ":memory:" and self._has_current_tables(conn):
+            logger.info(f"Reusing DuckDB tables from {MCP_DB_PATH}")
+            return conn
+
         logger.info("Initializing DuckDB with JSON data files")
-        self._duckdb_conn = duckdb.connect(":memory:")
+        self._load_tables(conn)
+        if MCP_DB_PATH != ":memory:":
+            self._save_source_signature(conn)
+        return conn
+
+    @staticmethod
+    def _source_signature() -> list[tuple[str, int]]:
+        """Name and modification time of each JSON data file that exists, plus the table layout."""
+        files = (FLIGHTS_FILE, ONEVIEW_FILE, UTILIZATION_FILE)
+        signature = [(path.name, path.stat().st_mtime_ns) for path in files if path.exists()]
+        return sorted([*signature, ("__layout__", _TABLE_LAYOUT_VERSION)])
+
+    @classmethod
+    def _has_current_tables(cls, conn: duckdb.DuckDBPyConnection) -> bool:
+        """Check whether a persisted database was loaded from the current JSON files."""
+        try:
+            stored = conn.execute(
+                "SELECT file, mtime_ns FROM load_meta.source_files ORDER BY file"
+            ).fetchall()
+        except duckdb.CatalogException:
+            return False
+        return stored == cls._source_signature()
+
+    @classmethod
+    def _save_source_signature(cls, conn: duckdb.DuckDBPyConnection) -> None:
+        """Record which JSON files the tables were loaded from."""
+        # Kept outside the main schema so SHOW TABLES only lists data tables
+        conn.execute("CREATE SCHEMA IF NOT EXISTS load_meta")
+        conn.execute(
+            "CREATE OR REPLACE TABLE load_meta.source_files (file VARCHAR, mtime_ns BIGINT)"
+        )
+        conn.executemany(
+            "INSERT INTO load_meta.source_files VALUES (?, ?)", cls._source_signature()
+        )
 
+    @staticmethod
+    def _load_tables(conn: duckdb.DuckDBPyConnection) -> None:
+        """(Re)build all tables from the JSON data files."""
         # Load flights data - the JSON has structure {"flights": [...]}
         if FLIGHTS_FILE.exists():
-            self._duckdb_conn.execute(f"""
-                CREATE TABLE flights AS
-                SELECT unnest(flights) AS flight FROM read_json_auto('{FLIGHTS_FILE}')
-            """)
-            # Flatten the nested structure
-            self._duckdb_conn.execute("""
+            # Unnest and flatten in one pass so the nested struct column is
+            # never materialized as an intermediate table
+            conn.execute(f"""
                 CREATE OR REPLACE TABLE flights AS
                 SELECT
                     flight.id as id,
@@ -109,19 +185,22 @@ class LogisticsMCP:
                     flight.utilizationPercent as utilizationPercent,
                     flight.riskLevel as riskLevel,
                     flight.sortTime as sortTime
-                FROM flights
+                FROM (
+                    SELECT unnest(flights) AS flight
+                    FROM read_json('{FLIGHTS_FILE}', columns = {{'flights': '{_FLIGHTS_JSON_TYPE}'}})
+                )
             """)
-            count = self._duckdb_conn.execute("SELECT COUNT(*) FROM flights").fetchone()
+            count = conn.execute("SELECT COUNT(*) FROM flights").fetchone()
             logger.info(f"Loaded {count[0] if count else 0} flights into DuckDB")
 
         # Load oneview data if exists
         if ONEVIEW_FILE.exists():
             try:
-                self._duckdb_conn.execute(f"""
-                    CREATE TABLE oneview AS
+                conn.execute(f"""
+                    CREATE OR REPLACE TABLE oneview AS
                     SELECT * FROM read_json_auto('{ONEVIEW_FILE}')
                 """)
-                count = self._duckdb_conn.execute("SELECT COUNT(*) FROM oneview").fetchone()
+                count = conn.execute("SELECT COUNT(*) FROM oneview").fetchone()
                 logger.info(f"Loaded {count[0] if count else 0} oneview records into DuckDB")
             except Exception as e:
                 logger.warning(f"Could not load oneview.json: {e}")
@@ -129,11 +208,11 @@ class LogisticsMCP:
         # Load utilization data if exists
         if UTILIZATION_FILE.exists():
             try:
-                self._duckdb_conn.execute(f"""
-                    CREATE TABLE utilization AS
+                conn.execute(f"""
+                    CREATE OR REPLACE TABLE utilization AS
                     SELECT * FROM read_json_auto('{UTILIZATION_FILE}')
                 """)
-                count = self._duckdb_conn.execute("SELECT COUNT(*) FROM utilization").fetchone()
+                count = conn.execute("SELECT COUNT(*) FROM utilization").fetchone()
                 logger.info(f"Loaded {count[0] if count else 0} utilization records into DuckDB")
             except Exception as e:
                 logger.warning(f"Could not load utilization.json: {e}")
@@ -141,45 +220,26 @@ class LogisticsMCP:
         # Load historical data from flights.json (historicalData array)
         if FLIGHTS_FILE.exists():
             try:
-                # Read the JSON file and extract historicalData
-                with open(FLIGHTS_FILE, encoding="utf-8") as f:
-                    data = json.load(f)
-                historical = data.get("historicalData", [])
-
-                if historical:
-                    # Create table from the historical data
-                    self._duckdb_conn.execute("""
-                        CREATE TABLE historical_data (
-                            date VARCHAR,
-                            route VARCHAR,
-                            pounds INTEGER,
-                            cubicFeet INTEGER,
-                            predicted BOOLEAN
-                        )
-                    """)
-
-                    # Insert historical data
-                    for record in historical:
-                        self._duckdb_conn.execute(
-                            "INSERT INTO historical_data VALUES (?, ?, ?, ?, ?)",
-                            [
-                                record.get("date"),
-                                record.get("route"),
-                                record.get("pounds"),
-                                record.get("cubicFeet"),
-                                record.get("predicted", False),
-                            ],
-                        )
-
-                    count = self._duckdb_conn.execute(
-                        "SELECT COUNT(*) FROM historical_data"
-                    ).fetchone()
-                    logger.info(f"Loaded {count[0] if count else 0} historical records into DuckDB")
+                # Shred the nested array inside DuckDB's JSON reader instead of
+                # decoding the file in Python and inserting records one by one.
+                conn.execute(f"""
+                    CREATE OR REPLACE TABLE historical_data AS
+                    SELECT
+                        CAST(record.date AS VARCHAR) AS date,
+                        CAST(record.route AS VARCHAR) AS route,
+                        CAST(record.pounds AS INTEGER) AS pounds,
+                        CAST(record.cubicFeet AS INTEGER) AS cubicFeet,
+                        COALESCE(CAST(record.predicted AS BOOLEAN), FALSE) AS predicted
+                    FROM (
+                        SELECT unnest(historicalData) AS record
+                        FROM read_json_auto('{FLIGHTS_FILE}')
+                    )
+                """)
+                count = conn.execute("SELECT COUNT(*) FROM historical_data").fetchone()
+                logger.info(f"Loaded {count[0] if count else 0} historical records into DuckDB")
             except Exception as e:
                 logger.warning(f"Could not load historical data: {e}")
 
-        return self._duckdb_conn
-
     def get_tables(self) -> str:
         """Gets the list of all tables and their schemas."""
         try:
@@ -187,11 +247,17 @@ class LogisticsMCP:
             result = conn.execute("SHOW TABLES").fetchall()
             tables = [row[0] for row in result]
 
-            # Get schema for each table
-            table_info = {}
-            for table in tables:
-                schema = conn.execute(f"DESCRIBE {table}").fetchall()
-                table_info[table] = [{"column": row[0], "type": row[1]} for row in schema]
+            # Get schemas for all tables in one catalog query
+            table_info: dict[str, list[dict[str, str]]] = {table: [] for table in tables}
+            columns = conn.execute("""
+                SELECT table_name, column_name, data_type
+                FROM information_schema.columns
+                WHERE table_catalog = current_database() AND table_schema = current_schema()
+                ORDER BY table_name, ordinal_position
+            """).fetchall()
+            for table, column, data_type in columns:
+                if table in table_info:
+                    table_info[table].append({"column": column, "type": data_type})
 
             return json.dumps(
                 {
@@ -221,22 +287,14 @@ class LogisticsMCP:
             colnames = [desc[0] for desc in result.description]
             rows = result.fetchall()
 
-            # Convert rows to serializable format
-            serializable_rows = []
-            for row in rows:
-                row_data = []
-                for val in row:
-                    if hasattr(val, "isoformat"):
-                        val = val.isoformat()
-                    row_data.append(val)
-                serializable_rows.append(row_data)
-
+            # Temporal values are converted by the encoder instead of a per-value loop
             return json.dumps(
                 {
                     "columns": colnames,
-                    "rows": serializable_rows,
+                    "rows": rows,
                     "row_count": len(rows),
-                }
+                },
+                default=_json_default,
             )
         except Exception as e:
             logger.error(f"Error executing query: {e}")
@@ -252,22 +310,96 @@ class LogisticsMCP:
 # ============================================================================
 
 
+# Shared DuckDB instance backing the REST endpoints
+_logistics_db = LogisticsMCP()
+
+# Flight columns as exposed by the REST API (JSON field names and formats)
+_FLIGHT_COLUMNS = """
+    id,
+    flightNumber,
+    CAST(flightDate AS VARCHAR) AS flightDate,
+    origin AS "from",
+    destination AS "to",
+    currentPounds,
+    maxPounds,
+    currentCubicFeet,
+    maxCubicFeet,
+    utilizationPercent,
+    riskLevel,
+    strftime(DATE '1970-01-01' + sortTime, '%H:%M') AS sortTime
+"""
+
+# LIMIT/OFFSET bind as BIGINT; larger values mean "everything" / "past the end" anyway
+_MAX_SQL_BIGINT = 2**63 - 1
+
+# Allowed sort_by values mapped to their flights table columns; anything else
+# falls back to the default so no caller-supplied text reaches ORDER BY
+_DEFAULT_FLIGHT_SORT = "utilizationPercent"
+_FLIGHT_SORT_COLUMNS = {
+    "id": "id",
+    "flightNumber": "flightNumber",
+    "flightDate": "flightDate",
+    "from": "origin",
+    "to": "destination",
+    "currentPounds": "currentPounds",
+    "maxPounds": "maxPounds",
+    "currentCubicFeet": "currentCubicFeet",
+    "maxCubicFeet": "maxCubicFeet",
+    "utilizationPercent": "utilizationPercent",
+    "riskLevel": "riskLevel",
+    "sortTime": "sortTime",
+}
+
+# Utilization buckets accepted by get_flights
+_UTILIZATION_FILTERS = {
+    "over": "utilizationPercent > 95",
+    "near_capacity": "utilizationPercent BETWEEN 85 AND 95",
+    "under": "utilizationPercent < 50",
+    "optimal": "utilizationPercent >= 50 AND utilizationPercent < 85",
+}
+
+
+def _fetch_dicts(result: duckdb.DuckDBPyConnection) -> list[dict[str, Any]]:
+    """Materialize a DuckDB result as a list of column-name keyed dicts."""
+    columns = [desc[0] for desc in result.description or []]
+    return [dict(zip(columns, row, strict=True)) for row in result.fetchall()]
+
+
 def _load_flight_data() -> dict:
-    """Load and cache flight data from the JSON file."""
-    global _HISTORICAL_DATA_CACHE
+    """Load and cache flight data from the DuckDB tables.
+
+    DuckDB is the only JSON parser; the flight cache is read back from the
+    table it built instead of decoding flights.json a second time. Historical
+    data is queried from historical_data directly and not cached in Python.
+    """
     if not _FLIGHT_DATA_CACHE:
-        logger.info(f"Loading flight data from {FLIGHTS_FILE}")
-        with open(FLIGHTS_FILE, encoding="utf-8") as f:
-            data = json.load(f)
-            # Also cache historical data
-            if not _HISTORICAL_DATA_CACHE:
-                _HISTORICAL_DATA_CACHE = data.get("historicalData", [])
-                logger.info(f"Loaded {len(_HISTORICAL_DATA_CACHE)} historical records")
-            _FLIGHT_DATA_CACHE.update(data)
-        logger.info(f"Loaded {len(_FLIGHT_DATA_CACHE.get('flights', []))} flights")
+        logger.info("Loading flight data from DuckDB")
+        conn = _logistics_db.get_connection()
+        flights = _fetch_dicts(
+            conn.execute(f"SELECT {_FLIGHT_COLUMNS} FROM flights ORDER BY rowid")
+        )
+        _FLIGHT_DATA_CACHE["flights"] = flights
+        _build_flight_indices(flights)
+        logger.info(f"Loaded {len(flights)} flights")
     return _FLIGHT_DATA_CACHE
 
 
+def _normalize_flight_number(value: str) -> str:
+    """Normalize a flight number for lookup (case, spaces and dashes ignored)."""
+    return value.upper().replace(" ", "").replace("-", "")
+
+
+def _build_flight_indices(flights: list[dict]) -> None:
+    """Index flights by ID and normalized flight number (first occurrence wins)."""
+    _FLIGHT_BY_ID.clear()
+    _FLIGHT_BY_NUMBER.clear()
+    for flight in flights:
+        if flight_id := flight.get("id"):
+            _FLIGHT_BY_ID.setdefault(flight_id, flight)
+        if flight_number := flight.get("flightNumber"):
+            _FLIGHT_BY_NUMBER.setdefault(_normalize_flight_number(flight_number), flight)
+
+
 def get_flights(
     limit: int = 100,
     offset: int = 0,
@@ -281,120 +413,209 @@ def get_flights(
     sort_desc: bool = True,
 ) -> dict[str, Any]:
     """Get flights with filtering, sorting, and pagination."""
-    data = _load_flight_data()
-    all_flights = data.get("flights", [])
+    # The flights table is immutable for the life of the process, so each
+    # distinct query is sorted and paginated once and then served from cache.
+    # Inputs are canonicalized first so equivalent requests share one entry and
+    # the generated SQL stays within the whitelisted shapes. The free-text
+    # filters (risk level, route, dates) are bound parameters and stay in the
+    # key as given; a caller cycling arbitrary values can only churn the
+    # bounded LRU, which only costs re-running a small in-memory query.
+    flights, total = _query_flights(
+        limit=min(max(limit, 0), _MAX_SQL_BIGINT),
+        offset=min(max(offset, 0), _MAX_SQL_BIGINT),
+        risk_level=risk_level,
+        utilization=utilization if utilization in _UTILIZATION_FILTERS else None,
+        route_from=route_from,
+        route_to=route_to,
+        date_from=date_from,
+        date_to=date_to,
+        sort_by=sort_by if sort_by in _FLIGHT_SORT_COLUMNS else _DEFAULT_FLIGHT_SORT,
+        sort_desc=sort_desc,
+    )
+
+    return {
+        # Shallow copy so callers can reorder or trim the page without touching the cache
+        "flights": list(flights),
+        "total": total,
+        "query": {
+            "limit": limit,
+            "offset": offset,
+            "risk_level": risk_level,
+            "utilization": utilization,
+            "route_from": route_from,
+            "route_to": route_to,
+            "date_from": date_from,
+            "date_to": date_to,
+        },
+    }
 
-    # Apply filters
-    filtered = all_flights
+
+@lru_cache(maxsize=256)
+def _query_flights(
+    limit: int = 100,
+    offset: int = 0,
+    risk_level: str | None = None,
+    utilization: str | None = None,
+    route_from: str | None = None,
+    route_to: str | None = None,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    sort_by: str = _DEFAULT_FLIGHT_SORT,
+    sort_desc: bool = True,
+) -> tuple[list[dict[str, Any]], int]:
+    """Run the flights query for get_flights; returns (page, total matches).
+
+    Results are cached per argument set.
+    """
+    conn = _logistics_db.get_connection()
+
+    # Build filters as bound parameters; only whitelisted SQL fragments are inlined
+    conditions: list[str] = []
+    params: list[Any] = []
 
     if risk_level:
-        filtered = [f for f in filtered if f.get("riskLevel") == risk_level]
+        conditions.append("riskLevel = ?")
+        params.append(risk_level)
 
     if utilization:
-        if utilization == "over":
-            filtered = [f for f in filtered if f.get("utilizationPercent", 0) > 95]
-        elif utilization == "near_capacity":
-            filtered = [f for f in filtered if 85 <= f.get("utilizationPercent", 0) <= 95]
-        elif utilization == "under":
-            filtered = [f for f in filtered if f.get("utilizationPercent", 0) < 50]
-        elif utilization == "optimal":
-            filtered = [f for f in filtered if 50 <= f.get("utilizationPercent", 0) < 85]
+        conditions.append(_UTILIZATION_FILTERS[utilization])
 
     if route_from:
-        filtered = [f for f in filtered if f.get("from", "").upper() == route_from.upper()]
+        conditions.append("upper(origin) = upper(?)")
+        params.append(route_from)
 
     if route_to:
-        filtered = [f for f in filtered if f.get("to", "").upper() == route_to.upper()]
+        conditions.append("upper(destination) = upper(?)")
+        params.append(route_to)
 
     if date_from:
-        filtered = [f for f in filtered if f.get("flightDate", "") >= date_from]
+        conditions.append("CAST(flightDate AS VARCHAR) >= ?")
+        params.append(date_from)
 
     if date_to:
-        filtered = [f for f in filtered if f.get("flightDate", "") <= date_to]
-
-    # Sort
-    if sort_by and filtered:
-        filtered = sorted(
-            filtered,
-            key=lambda x: (
-                x.get(sort_by, 0)
-                if isinstance(x.get(sort_by), (int, float))
-                else str(x.get(sort_by, ""))
-            ),
-            reverse=sort_desc,
-        )
+        conditions.append("CAST(flightDate AS VARCHAR) <= ?")
+        params.append(date_to)
 
-    total = len(filtered)
-    paginated = filtered[offset : offset + limit]
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
 
-    return {
-        "flights": paginated,
-        "total": total,
-        "query": {
-            "limit": limit,
-            "offset": offset,
-            "risk_level": risk_level,
-            "utilization": utilization,
-            "route_from": route_from,
-            "route_to": route_to,
-            "date_from": date_from,
-            "date_to": date_to,
-        },
-    }
+    # Sort (ties keep file order)
+    sort_column = _FLIGHT_SORT_COLUMNS[sort_by]
+    order_by = f"{sort_column} {'DESC' if sort_desc else 'ASC'}, rowid"
+
+    count = conn.execute(f"SELECT COUNT(*) FROM flights {where}", params).fetchone()
+    total = count[0] if count else 0
+    paginated = _fetch_dicts(
+        conn.execute(
+            f"SELECT {_FLIGHT_COLUMNS} FROM flights {where} ORDER BY {order_by} LIMIT ? OFFSET ?",
+            [*params, limit, offset],
+        )
+    )
+
+    return paginated, total
 
 
 def get_flight_by_id(flight_id: str) -> dict[str, Any]:
     """Get a specific flight by ID or flight number."""
-    data = _load_flight_data()
-    all_flights = data.get("flights", [])
+    _load_flight_data()  # Ensure data and indices are loaded
 
-    search = flight_id.upper().replace(" ", "").replace("-", "")
-    for flight in all_flights:
-        flight_num = flight.get("flightNumber", "").upper().replace("-", "")
-        if flight.get("id") == flight_id or flight_num == search:
-            return {"flight": flight}
+    flight = _FLIGHT_BY_ID.get(flight_id) or _FLIGHT_BY_NUMBER.get(
+        _normalize_flight_number(flight_id)
+    )
+    if flight is not None:
+        return {"flight": flight}
 
     return {"flight": None, "error": f"Flight {flight_id} not found"}
 
 
 def get_flight_summary() -> dict[str, Any]:
     """Get a summary of all available flight data."""
-    data = _load_flight_data()
-    flights = data.get("flights", [])
-
-    risk_counts = {"low": 0, "medium": 0, "high": 0, "critical": 0}
-    route_counts: dict[str, int] = {}
-    total_utilization = 0
-
-    for f in flights:
-        risk = f.get("riskLevel", "unknown")
-        if risk in risk_counts:
-            risk_counts[risk] += 1
-
-        route = f"{f.get('from', '?')} → {f.get('to', '?')}"
-        route_counts[route] = route_counts.get(route, 0) + 1
-        total_utilization += f.get("utilizationPercent", 0)
-
-    avg_utilization = total_utilization / len(flights) if flights else 0
-
-    airports = set()
-    for f in flights:
-        airports.add(f.get("from", ""))
-        airports.add(f.get("to", ""))
-    airports.discard("")
+    if not _SUMMARY_CACHE:
+        _SUMMARY_CACHE.update(_build_flight_summary())
+    return dict(_SUMMARY_CACHE)
+
+
+def _build_flight_summary() -> dict[str, Any]:
+    """Aggregate the flights table into the summary payload."""
+    conn = _logistics_db.get_connection()
+
+    # Aggregates without GROUP BY always yield exactly one row
+    totals = _fetch_dicts(
+        conn.execute("""
+            SELECT
+                COUNT(*) AS total,
+                COUNT(*) FILTER (WHERE riskLevel = 'low') AS low,
+                COUNT(*) FILTER (WHERE riskLevel = 'medium') AS medium,
+                COUNT(*) FILTER (WHERE riskLevel = 'high') AS high,
+                COUNT(*) FILTER (WHERE riskLevel = 'critical') AS critical,
+                AVG(utilizationPercent) AS avg_utilization,
+                COUNT(DISTINCT (origin, destination)) AS unique_routes
+            FROM flights
+        """)
+    )[0]
+    risk_counts = {level: totals[level] for level in ("low", "medium", "high", "critical")}
+    avg_utilization = totals["avg_utilization"] or 0
+
+    top_routes = conn.execute("""
+        SELECT COALESCE(origin, '?') || ' → ' || COALESCE(destination, '?') AS route, COUNT(*)
+        FROM flights
+        GROUP BY route
+        ORDER BY COUNT(*) DESC, MIN(rowid)
+        LIMIT 10
+    """).fetchall()
+
+    airports = conn.execute("""
+        SELECT airport FROM (
+            SELECT origin AS airport FROM flights
+            UNION
+            SELECT destination FROM flights
+        )
+        WHERE airport IS NOT NULL AND airport <> ''
+        ORDER BY airport
+    """).fetchall()
 
     return {
-        "totalFlights": len(flights),
+        "totalFlights": totals["total"],
         "riskBreakdown": risk_counts,
         "averageUtilization": round(avg_utilization, 1),
-        "uniqueRoutes": len(route_counts),
-        "topRoutes": sorted(route_counts.items(), key=lambda x: x[1], reverse=True)[:10],
-        "airports": sorted(list(airports)),
+        "uniqueRoutes": totals["unique_routes"],
+        "topRoutes": top_routes,
+        "airports": [row[0] for row in airports],
         "flightsAtRisk": risk_counts["high"] + risk_counts["critical"],
         "underUtilizedFlights": risk_counts["low"],
     }
 
 
+def _normalize_route(route: str) -> str:
+    """Normalize a route filter (e.g. 'LAX-ORD') to the stored 'LAX → ORD' form."""
+    return route.replace("-", " → ").replace("->", " → ").replace(" - ", " → ")
+
+
+def _query_historical_records(
+    route: str | None = None,
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
+    """Fetch historical_data records, optionally for one route.
+
+    Returns (historical, predicted), each ordered by date; records sharing a
+    date keep their file order. Both partitions come from one sorted scan.
+    """
+    conn = _logistics_db.get_connection()
+    normalized = _normalize_route(route) if route else None
+    records = _fetch_dicts(
+        conn.execute(
+            """
+            SELECT date, route, pounds, cubicFeet, predicted
+            FROM historical_data
+            WHERE CAST(? AS VARCHAR) IS NULL OR route = ?
+            ORDER BY predicted, date, rowid
+            """,
+            [normalized, normalized],
+        )
+    )
+    # FALSE sorts before TRUE, so predictions start at the first predicted record
+    split = bisect_left(records, True, key=lambda record: record["predicted"])
+    return records[:split], records[split:]
+
+
 def get_historical_data(
     days: int = 7,
     route: str | None = None,
@@ -410,29 +631,13 @@ def get_historical_data(
     Returns:
         Dict with historical data, predictions, and summary statistics
     """
-    _load_flight_data()  # Ensure data is loaded
-    all_data = _HISTORICAL_DATA_CACHE.copy()
-
-    # Filter by route if specified
-    if route:
-        # Normalize route format
-        normalized = route.replace("-", " → ").replace("->", " → ").replace(" - ", " → ")
-        all_data = [d for d in all_data if d.get("route") == normalized]
-
-    # Separate historical and predicted data
-    historical = [d for d in all_data if not d.get("predicted", False)]
-    predictions = [d for d in all_data if d.get("predicted", False)]
-
-    # Sort by date (descending for historical to get most recent first)
-    historical = sorted(historical, key=lambda x: x.get("date", ""), reverse=True)
-    predictions = sorted(predictions, key=lambda x: x.get("date", ""))
+    # Historical and predicted data, both already sorted by date
+    historical, predictions = _query_historical_records(route)
 
     # Limit historical to requested number of unique days (not records)
     if historical:
-        unique_dates = sorted(set(d.get("date", "") for d in historical), reverse=True)[:days]
-        historical = [d for d in historical if d.get("date", "") in unique_dates]
-        # Re-sort ascending for display
-        historical = sorted(historical, key=lambda x: x.get("date", ""))
+        unique_dates = set(sorted({d["date"] for d in historical}, reverse=True)[:days])
+        historical = [d for d in historical if d["date"] in unique_dates]
 
     # Calculate statistics
     if historical:
@@ -474,17 +679,8 @@ def get_predictions(
     Returns:
         Dict with prediction data
     """
-    _load_flight_data()  # Ensure data is loaded
-    all_data = _HISTORICAL_DATA_CACHE.copy()
-
-    # Filter by route if specified
-    if route:
-        normalized = route.replace("-", " → ").replace("->", " → ").replace(" - ", " → ")
-        all_data = [d for d in all_data if d.get("route") == normalized]
-
-    # Get only predictions
-    predictions = [d for d in all_data if d.get("predicted", False)]
-    predictions = sorted(predictions, key=lambda x: x.get("date", ""))
+    # Get only predictions (already sorted by date)
+    _, predictions = _query_historical_records(route)
     predictions = predictions[:days]
 
     # Get unique routes in predictions
@@ -503,38 +699,35 @@ def get_predictions(
 
 def get_available_routes() -> dict[str, Any]:
     """Get list of all available routes in historical data."""
-    _load_flight_data()  # Ensure data is loaded
-
-    routes: dict[str, dict] = {}
-    for record in _HISTORICAL_DATA_CACHE:
-        route = record.get("route", "")
-        if route:
-            if route not in routes:
-                routes[route] = {
-                    "historical_count": 0,
-                    "prediction_count": 0,
-                    "total_pounds": 0,
-                }
-            if record.get("predicted"):
-                routes[route]["prediction_count"] += 1
-            else:
-                routes[route]["historical_count"] += 1
-                routes[route]["total_pounds"] += record.get("pounds", 0)
-
-    route_list = []
-    for route, stats in routes.items():
-        avg_pounds = stats["total_pounds"] // max(1, stats["historical_count"])
-        route_list.append(
-            {
-                "route": route,
-                "historicalRecords": stats["historical_count"],
-                "predictionRecords": stats["prediction_count"],
-                "averagePounds": avg_pounds,
-            }
-        )
+    if not _ROUTES_CACHE:
+        _ROUTES_CACHE.update(_build_available_routes())
+    return dict(_ROUTES_CACHE)
+
+
+def _build_available_routes() -> dict[str, Any]:
+    """Aggregate historical_data into per-route statistics."""
+    conn = _logistics_db.get_connection()
+
+    route_list = _fetch_dicts(
+        conn.execute("""
+            SELECT
+                route,
+                COUNT(*) FILTER (WHERE NOT predicted) AS historicalRecords,
+                COUNT(*) FILTER (WHERE predicted) AS predictionRecords,
+                CAST(
+                    COALESCE(SUM(pounds) FILTER (WHERE NOT predicted), 0)
+                    // GREATEST(1, COUNT(*) FILTER (WHERE NOT predicted))
+                    AS BIGINT
+                ) AS averagePounds
+            FROM historical_data
+            WHERE route IS NOT NULL AND route <> ''
+            GROUP BY route
+            ORDER BY historicalRecords DESC, MIN(rowid)
+        """)
+    )
 
     return {
-        "routes": sorted(route_list, key=lambda x: x["historicalRecords"], reverse=True),
+        "routes": route_list,
         "totalRoutes": len(route_list),
     }
 
@@ -544,11 +737,31 @@ def get_available_routes() -> dict[str, Any]:
 # ============================================================================
 
 
+def _int_param(request: Request, name: str, default: int) -> int:
+    """Read an integer query parameter, raising ValueError with a client-facing message."""
+    value = request.query_params.get(name)
+    if value is None:
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Query parameter '{name}' must be an integer") from None
+
+
+def _bad_request(message: str) -> JSONResponse:
+    """Build a 400 response for invalid query parameters."""
+    return JSONResponse({"error": message}, status_code=400)
+
+
 async def rest_get_historical(request: Request) -> JSONResponse:
     """REST endpoint for getting historical data."""
     params = request.query_params
+    try:
+        days = _int_param(request, "days", 7)
+    except ValueError as e:
+        return _bad_request(str(e))
     result = get_historical_data(
-        days=int(params.get("days", 7)),
+        days=days,
         route=params.get("route"),
         include_predictions=params.get("include_predictions", "true").lower() == "true",
     )
@@ -558,8 +771,12 @@ async def rest_get_historical(request: Request) -> JSONResponse:
 async def rest_get_predictions(request: Request) -> JSONResponse:
     """REST endpoint for getting predictions."""
     params = request.query_params
+    try:
+        days = _int_param(request, "days", 7)
+    except ValueError as e:
+        return _bad_request(str(e))
     result = get_predictions(
-        days=int(params.get("days", 7)),
+        days=days,
         route=params.get("route"),
     )
     return JSONResponse(result)
@@ -574,16 +791,21 @@ async def rest_get_routes(request: Request) -> JSONResponse:
 async def rest_get_flights(request: Request) -> JSONResponse:
     """REST endpoint for getting flights."""
     params = request.query_params
+    try:
+        limit = _int_param(request, "limit", 100)
+        offset = _int_param(request, "offset", 0)
+    except ValueError as e:
+        return _bad_request(str(e))
     result = get_flights(
-        limit=int(params.get("limit", 100)),
-        offset=int(params.get("offset", 0)),
+        limit=limit,
+        offset=offset,
         risk_level=params.get("risk_level"),
         utilization=params.get("utilization"),
         route_from=params.get("route_from"),
         route_to=params.get("route_to"),
         date_from=params.get("date_from"),
         date_to=params.get("date_to"),
-        sort_by=params.get("sort_by", "utilizationPercent"),
+        sort_by=params.get("sort_by", _DEFAULT_FLIGHT_SORT),
         sort_desc=params.get("sort_desc", "true").lower() == "true",
     )
     return JSONResponse(result)
@@ -602,6 +824,16 @@ async def rest_get_summary(request: Request) -> JSONResponse:
     return JSONResponse(result)
 
 
+def _count_historical_records() -> int:
+    """Number of rows in historical_data (0 if it could not be loaded)."""
+    conn = _logistics_db.get_connection()
+    try:
+        count = conn.execute("SELECT COUNT(*) FROM historical_data").fetchone()
+    except duckdb.CatalogException:
+        return 0
+    return count[0] if count else 0
+
+
 async def health_check(request: Request) -> JSONResponse:
     """Health check endpoint."""
     data = _load_flight_data()
@@ -611,29 +843,48 @@ async def health_check(request: Request) -> JSONResponse:
             "server": "logistics-mcp",
             "transport": "http/sse",
             "flights_loaded": len(data.get("flights", [])),
-            "historical_records": len(_HISTORICAL_DATA_CACHE),
+            "historical_records": _count_historical_records(),
             "auth_enabled": is_auth_enabled(),
         }
     )
 
 
+@asynccontextmanager
+async def lifespan(_app: Starlette) -> AsyncIterator[None]:
+    """Application lifespan handler; releases shared HTTP clients on shutdown."""
+    yield
+    await close_jwks_client()
+
+
+# Debug tracebacks on errors; shared by the REST app and its mounted /api app,
+# since a mounted Starlette app handles its own exceptions.
+REST_DEBUG = True
+
+# Authenticated API routes live in their own sub-application so the auth
+# middleware only wraps /api/*; /health is dispatched without it.
+api_app = Starlette(
+    debug=REST_DEBUG,
+    routes=[
+        Route("/flights", rest_get_flights, methods=["GET"]),
+        Route("/flights/{flight_id:str}", rest_get_flight, methods=["GET"]),
+        Route("/summary", rest_get_summary, methods=["GET"]),
+        Route("/historical", rest_get_historical, methods=["GET"]),
+        Route("/predictions", rest_get_predictions, methods=["GET"]),
+        Route("/routes", rest_get_routes, methods=["GET"]),
+    ],
+    middleware=[Middleware(EntraIDAuthMiddleware)],
+)
+
 # Create Starlette app with REST routes
 rest_app = Starlette(
-    debug=True,
+    debug=REST_DEBUG,
+    lifespan=lifespan,
     routes=[
         Route("/health", health_check, methods=["GET"]),
-        Route("/api/flights", rest_get_flights, methods=["GET"]),
-        Route("/api/flights/{flight_id:str}", rest_get_flight, methods=["GET"]),
-        Route("/api/summary", rest_get_summary, methods=["GET"]),
-        Route("/api/historical", rest_get_historical, methods=["GET"]),
-        Route("/api/predictions", rest_get_predictions, methods=["GET"]),
-        Route("/api/routes", rest_get_routes, methods=["GET"]),
+        Mount("/api", app=api_app),
     ],
 )
 
-# Add authentication middleware
-rest_app.add_middleware(EntraIDAuthMiddleware)
-
 
 # ============================================================================
 # Main Entry Point
@@ -646,6 +897,7 @@ if __name__ == "__main__":
     logger.info(f"REST API: http://{MCP_HOST}:{MCP_PORT}/api/flights")
 
     # Pre-load flight data
+    _logistics_db.init()
     _load_flight_data()
 
     uvicorn.run(rest_app, host=MCP_HOST, port=MCP_PORT)
@@ -21,7 +21,7 @@ from agent_framework_ag_ui import AgentFrameworkAgent
 from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
 from opentelemetry import trace
 
-from patches.agui_event_stream import attach_agui_context_sync
+from patches.agui_event_stream import agui_request_context
 
 # Import all tools from the tools package
 from .tools import (
@@ -37,6 +37,7 @@ from .tools import (
     reset_filters,
     show_overall_feedback_card,
 )
+from .tools.trace_helpers import site_identity_span_attributes
 from .utils import get_trace_identity
 
 logger = logging.getLogger(__name__)
@@ -208,23 +209,20 @@ def create_logistics_agent(chat_client: SupportsChatGetResponse) -> AgentFramewo
         use_service_session=True,
     )
 
-    # Safer than global monkey patching: attach context sync to this instance only.
-    attach_agui_context_sync(agui_agent)
-
     original_run = agui_agent.run
 
-    async def traced_run(input_data: dict[str, object]):
-        with tracer.start_as_current_span("agent.run") as span:
-            span.set_attribute("gen_ai.agent.name", "logistics-agent")
-            identity = get_trace_identity()
-            if identity:
-                span.set_attribute("gen_ai.conversation.id", identity.conversation_id)
-                if identity.run_id:
-                    span.set_attribute("gen_ai.run.id", identity.run_id)
-                if identity.turn_id:
-                    span.set_attribute("gen_ai.turn.id", identity.turn_id)
-            async for event in original_run(input_data):
-                yield event
+    # Safer than global monkey patching: wrap this instance only. Context sync
+    # and tracing share one wrapper so each streamed event crosses a single
+    # passthrough frame instead of one per layer.
+    async def traced_run(input_data: dict[str, Any]):
+        with agui_request_context(input_data):
+            attributes = {
+                "gen_ai.agent.name": "logistics-agent",
+                **site_identity_span_attributes(get_trace_identity()),
+            }
+            with tracer.start_as_current_span("agent.run", attributes=attributes):
+                async for event in original_run(input_data):
+                    yield event
 
     agui_agent.run = traced_run
 
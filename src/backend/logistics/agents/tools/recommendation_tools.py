@@ -27,6 +27,10 @@ logger = logging.getLogger(__name__)
 # Note: A2A agents expose their card at /.well-known/agent.json
 RECOMMENDATIONS_AGENT_URL = "http://localhost:5002"
 
+# Header lines in the agent's free-text reply that are not recommendations.
+_RESPONSE_HEADER_PREFIXES = ("here are", "recommendations")
+_LIST_NUMBER_PATTERN = re.compile(r"^\d+[\.\)]\s*")
+
 
 def _get_recommendations_agent_url() -> str:
     """Get the recommendations agent URL from environment or use default."""
@@ -76,7 +80,7 @@ async def call_recommendations_agent(query: str) -> str:
         The response text from the recommendations agent.
     """
     agent_url = _get_recommendations_agent_url()
-    logger.info(f"Calling A2A recommendations agent at {agent_url} with query: {query}")
+    logger.info("Calling A2A recommendations agent at %s with query: %s", agent_url, query)
 
     with _tracer.start_as_current_span("a2a.recommendations.request") as span:
         span.set_attribute("a2a.query.length", len(query))
@@ -89,7 +93,8 @@ async def call_recommendations_agent(query: str) -> str:
             response_text = str(response)
 
             if response_text:
-                logger.info(f"Received A2A response: {response_text[:100]}...")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Received A2A response: %s...", response_text[:100])
                 return response_text
 
             # Fallback: try to extract from messages
@@ -196,14 +201,10 @@ async def get_recommendations(
             for line in lines:
                 line = line.strip()
                 # Skip empty lines and headers
-                if (
-                    not line
-                    or line.lower().startswith("here are")
-                    or line.lower().startswith("recommendations")
-                ):
+                if not line or line.lower().startswith(_RESPONSE_HEADER_PREFIXES):
                     continue
                 # Remove leading numbers like "1.", "2.", etc.
-                cleaned = re.sub(r"^\d+[\.\)]\s*", "", line)
+                cleaned = _LIST_NUMBER_PATTERN.sub("", line)
                 if cleaned and len(cleaned) > 10:  # Minimum length for a valid recommendation
                     rec_id += 1
                     category = (
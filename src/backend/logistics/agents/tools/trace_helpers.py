@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 from contextlib import contextmanager
 from typing import Any
 
@@ -27,28 +28,48 @@ def validate_trace_identity_payload(payload: dict[str, Any]) -> TraceIdentity |
     return TraceIdentity.model_validate(payload)
 
 
-def _apply_identity(span: trace.Span, identity: TraceIdentity | None) -> None:
+def identity_span_attributes(identity: TraceIdentity | None) -> dict[str, str]:
+    """Build span attributes for a trace identity.
+
+    Passed as ``attributes=`` when a span starts, so they are recorded in one
+    step (and visible to samplers) instead of one ``set_attribute`` call each.
+    """
     if not identity:
-        return
+        return {}
 
-    span.set_attribute(ATTR_CONVERSATION_ID, identity.conversation_id)
+    attributes = {ATTR_CONVERSATION_ID: identity.conversation_id}
     if identity.turn_id:
-        span.set_attribute(ATTR_TURN_ID, identity.turn_id)
+        attributes[ATTR_TURN_ID] = identity.turn_id
     if identity.run_id:
-        span.set_attribute(ATTR_RUN_ID, identity.run_id)
+        attributes[ATTR_RUN_ID] = identity.run_id
     if identity.tool_call_id:
-        span.set_attribute(ATTR_TOOL_CALL_ID, identity.tool_call_id)
+        attributes[ATTR_TOOL_CALL_ID] = identity.tool_call_id
     if identity.a2a_interaction_id:
-        span.set_attribute(ATTR_A2A_INTERACTION_ID, identity.a2a_interaction_id)
+        attributes[ATTR_A2A_INTERACTION_ID] = identity.a2a_interaction_id
+    return attributes
+
+
+def is_identity_span_processor_enabled() -> bool:
+    """Whether monitoring's TraceIdentitySpanProcessor stamps identity on every span."""
+    return os.getenv("ENABLE_TRACE_IDENTITY_SPAN_PROCESSOR", "false").lower() == "true"
+
+
+def site_identity_span_attributes(identity: TraceIdentity | None) -> dict[str, str]:
+    """Identity attributes for spans started here, unless the span processor adds them."""
+    if is_identity_span_processor_enabled():
+        return {}
+    return identity_span_attributes(identity)
 
 
 @contextmanager
 def traced_tool_span(tool_name: str):
     """Emit a tool span with standard identity and status attributes."""
-    with _tracer.start_as_current_span(f"tool.{tool_name}") as span:
-        span.set_attribute(ATTR_TOOL_NAME, tool_name)
-        span.set_attribute(ATTR_TOOL_STATUS, "started")
-        _apply_identity(span, get_trace_identity())
+    attributes = {
+        ATTR_TOOL_NAME: tool_name,
+        ATTR_TOOL_STATUS: "started",
+        **site_identity_span_attributes(get_trace_identity()),
+    }
+    with _tracer.start_as_current_span(f"tool.{tool_name}", attributes=attributes) as span:
         try:
             yield span
             span.set_attribute(ATTR_TOOL_STATUS, "completed")
@@ -13,6 +13,7 @@ from .data_helpers import (
 
 # MCP client functions (HTTP-based)
 from .mcp_client import (
+    close_mcp_credentials,
     get_all_flights_from_mcp,
     get_all_flights_sync,
     get_flight_by_id_from_mcp,
@@ -38,7 +39,12 @@ from .session_models import (
     SessionRenameRequest,
     SessionSummary,
 )
-from .trace_context import clear_trace_identity, get_trace_identity, set_trace_identity
+from .trace_context import (
+    clear_trace_identity,
+    get_trace_identity,
+    reset_trace_identity,
+    set_trace_identity,
+)
 from .trace_models import TraceIdentity, TraceIdentityHeaders
 
 __all__ = [
@@ -66,6 +72,7 @@ __all__ = [
     "get_historical_sync",
     "get_predictions_sync",
     "get_routes_sync",
+    "close_mcp_credentials",
     "CanonicalSessionLinkage",
     "SessionSummary",
     "SessionListResponse",
@@ -76,6 +83,7 @@ __all__ = [
     "SessionMutationResult",
     "TraceIdentity",
     "TraceIdentityHeaders",
+    "reset_trace_identity",
     "set_trace_identity",
     "get_trace_identity",
     "clear_trace_identity",
@@ -21,11 +21,15 @@ Configuration via environment variables:
 
 from __future__ import annotations
 
+import asyncio
 import logging
 import os
+import time
 from typing import Any
 
 import httpx
+from azure.identity import CredentialUnavailableError, DefaultAzureCredential
+from azure.identity.aio import DefaultAzureCredential as AsyncDefaultAzureCredential
 
 logger = logging.getLogger(__name__)
 
@@ -35,15 +39,74 @@ MCP_TIMEOUT = float(os.getenv("MCP_TIMEOUT", "10.0"))
 MCP_CLIENT_ID = os.getenv("MCP_CLIENT_ID", "")  # The MCP server's app registration client ID
 MCP_AUTH_ENABLED = os.getenv("MCP_AUTH_ENABLED", "false").lower() == "true"
 
+# The scope is the MCP server's App ID URI with /.default
+_MCP_TOKEN_SCOPE = f"api://{MCP_CLIENT_ID}/.default"
+_MCP_TOKEN_CACHE_KEY = f"token:{MCP_CLIENT_ID}"
+
 # Token cache (simple in-memory cache)
 _token_cache: dict[str, Any] = {}
 
+# When no credential in the chain is available, skip further attempts for this
+# many seconds so unauthenticated fallbacks don't re-run the full chain per
+# request. Other (possibly transient) failures are retried on the next call.
+MCP_TOKEN_FAILURE_TTL = 60.0
+_token_failure_until: float = 0.0
+
+# Credentials are shared across calls; each new instance re-probes the credential
+# chain (environment, managed identity/IMDS, CLI) before it can issue a token.
+_credential: DefaultAzureCredential | None = None
+_async_credential: AsyncDefaultAzureCredential | None = None
+_async_credential_lock = asyncio.Lock()
+
 
 def get_mcp_server_url() -> str:
     """Get the MCP server base URL."""
     return MCP_SERVER_URL
 
 
+def _get_credential() -> DefaultAzureCredential:
+    """Get the shared sync credential, creating it on first use."""
+    global _credential
+    if _credential is None:
+        _credential = DefaultAzureCredential()
+    return _credential
+
+
+async def _get_async_credential() -> AsyncDefaultAzureCredential:
+    """Get the shared async credential, creating it once under a lock."""
+    global _async_credential
+    if _async_credential is None:
+        async with _async_credential_lock:
+            if _async_credential is None:
+                _async_credential = AsyncDefaultAzureCredential()
+    return _async_credential
+
+
+def _record_token_failure() -> None:
+    """Suppress token acquisition retries for MCP_TOKEN_FAILURE_TTL seconds."""
+    global _token_failure_until
+    _token_failure_until = time.monotonic() + MCP_TOKEN_FAILURE_TTL
+
+
+def _cached_token(min_remaining_seconds: float) -> str | None:
+    """Return the cached token if it stays valid for at least the given time."""
+    cached = _token_cache.get(_MCP_TOKEN_CACHE_KEY)
+    if cached and cached.get("expires_on", 0) > time.time() + min_remaining_seconds:
+        return cached.get("token")
+    return None
+
+
+async def close_mcp_credentials() -> None:
+    """Close the shared credentials (call on application shutdown)."""
+    global _credential, _async_credential
+    if _async_credential is not None:
+        await _async_credential.close()
+        _async_credential = None
+    if _credential is not None:
+        _credential.close()
+        _credential = None
+
+
 def _get_mcp_token() -> str | None:
     """
     Get an access token for the MCP server using DefaultAzureCredential.
@@ -59,37 +122,35 @@ def _get_mcp_token() -> str | None:
         logger.debug("MCP_CLIENT_ID not configured, skipping token acquisition")
         return None
 
-    try:
-        from azure.identity import DefaultAzureCredential
-
-        # Check cache first (simple cache, not checking expiry in detail)
-        cache_key = f"token:{MCP_CLIENT_ID}"
-        if cache_key in _token_cache:
-            cached = _token_cache[cache_key]
-            # Use cached token if it has more than 5 minutes until expiry
-            import time
+    # Check cache first; use cached token if it has more than 5 minutes until expiry
+    cached = _cached_token(300)
+    if cached:
+        return cached
 
-            if cached.get("expires_on", 0) > time.time() + 300:
-                return cached.get("token")
+    # No credential available recently; keep using a not-yet-expired token meanwhile
+    if time.monotonic() < _token_failure_until:
+        return _cached_token(0)
 
+    try:
         # Acquire new token
-        credential = DefaultAzureCredential()
-        # The scope should be the MCP server's App ID URI with /.default
-        scope = f"api://{MCP_CLIENT_ID}/.default"
-        token = credential.get_token(scope)
+        token = _get_credential().get_token(_MCP_TOKEN_SCOPE)
 
         # Cache the token
-        _token_cache[cache_key] = {
+        _token_cache[_MCP_TOKEN_CACHE_KEY] = {
             "token": token.token,
             "expires_on": token.expires_on,
         }
 
-        logger.debug(f"Acquired MCP access token (expires: {token.expires_on})")
+        logger.debug("Acquired MCP access token (expires: %s)", token.expires_on)
         return token.token
 
+    except CredentialUnavailableError as e:
+        logger.warning(f"Failed to acquire MCP token: {e}")
+        _record_token_failure()
+        return _cached_token(0)
     except Exception as e:
         logger.warning(f"Failed to acquire MCP token: {e}")
-        return None
+        return _cached_token(0)
 
 
 def _get_auth_headers() -> dict[str, str]:
@@ -110,34 +171,34 @@ async def _get_mcp_token_async() -> str | None:
     if not MCP_CLIENT_ID:
         return None
 
-    try:
-        import time
-
-        from azure.identity.aio import DefaultAzureCredential as AsyncDefaultAzureCredential
+    # Check cache
+    cached = _cached_token(300)
+    if cached:
+        return cached
 
-        # Check cache
-        cache_key = f"token:{MCP_CLIENT_ID}"
-        if cache_key in _token_cache:
-            cached = _token_cache[cache_key]
-            if cached.get("expires_on", 0) > time.time() + 300:
-                return cached.get("token")
+    if time.monotonic() < _token_failure_until:
+        return _cached_token(0)
 
+    try:
         # Acquire new token
-        async with AsyncDefaultAzureCredential() as credential:
-            scope = f"api://{MCP_CLIENT_ID}/.default"
-            token = await credential.get_token(scope)
+        credential = await _get_async_credential()
+        token = await credential.get_token(_MCP_TOKEN_SCOPE)
 
         # Cache the token
-        _token_cache[cache_key] = {
+        _token_cache[_MCP_TOKEN_CACHE_KEY] = {
             "token": token.token,
             "expires_on": token.expires_on,
         }
 
         return token.token
 
+    except CredentialUnavailableError as e:
+        logger.warning(f"Failed to acquire MCP token (async): {e}")
+        _record_token_failure()
+        return _cached_token(0)
     except Exception as e:
         logger.warning(f"Failed to acquire MCP token (async): {e}")
-        return None
+        return _cached_token(0)
 
 
 async def _get_auth_headers_async() -> dict[str, str]:
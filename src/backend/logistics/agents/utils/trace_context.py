@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from contextvars import ContextVar
+from contextvars import ContextVar, Token
 
 from .trace_models import TraceIdentity
 
@@ -10,8 +10,12 @@ _current_trace_identity: ContextVar[TraceIdentity | None] = ContextVar(
 )
 
 
-def set_trace_identity(identity: TraceIdentity | None) -> None:
-    _current_trace_identity.set(identity)
+def set_trace_identity(identity: TraceIdentity | None) -> Token[TraceIdentity | None]:
+    return _current_trace_identity.set(identity)
+
+
+def reset_trace_identity(token: Token[TraceIdentity | None]) -> None:
+    _current_trace_identity.reset(token)
 
 
 def get_trace_identity() -> TraceIdentity | None:
@@ -17,12 +17,15 @@ from starlette.middleware.base import BaseHTTPMiddleware
 
 # ============================================================================
 # IMPORTANT: Import patches FIRST before any other imports
-# This applies critical workarounds for pydantic and deepcopy issues.
-# See patches.py for details on the issues being fixed.
+# This applies the optional AG-UI context sync class patch (PATCH_AGUI_CONTEXT_SYNC).
+# See patches/__init__.py for details.
 # ============================================================================
 import patches  # noqa: F401 - side effects only
 from agents import create_logistics_agent, ensure_foundry_agent_exists  # type: ignore
-from agents.tools.trace_helpers import validate_trace_identity_payload
+from agents.tools.trace_helpers import (
+    site_identity_span_attributes,
+    validate_trace_identity_payload,
+)
 from agents.utils import (
     SessionBlockedResponse,
     SessionListResponse,
@@ -31,6 +34,7 @@ from agents.utils import (
     SessionRenameRequest,
     TraceIdentityHeaders,
     clear_trace_identity,
+    close_mcp_credentials,
     get_flight_by_id_from_mcp,
     get_flight_summary_from_mcp,
     get_flights_from_mcp,
@@ -174,6 +178,7 @@ async def lifespan(_app: FastAPI):
     yield
 
     # Shutdown: Cleanup
+    await close_mcp_credentials()
     logger.info("Application shutdown complete")
 
 
@@ -220,13 +225,9 @@ class TraceIdentityMiddleware(BaseHTTPMiddleware):
                         await _extract_conversation_id_from_logistics_request(request)
                     )
 
-                with tracer.start_as_current_span("turn.lifecycle") as span:
-                    if identity:
-                        span.set_attribute("gen_ai.conversation.id", identity.conversation_id)
-                        if identity.turn_id:
-                            span.set_attribute("gen_ai.turn.id", identity.turn_id)
-                        if identity.run_id:
-                            span.set_attribute("gen_ai.run.id", identity.run_id)
+                with tracer.start_as_current_span(
+                    "turn.lifecycle", attributes=site_identity_span_attributes(identity)
+                ):
                     response = await call_next(request)
 
                 if (
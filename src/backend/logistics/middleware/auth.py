@@ -146,13 +146,12 @@ class AzureADAuthMiddleware(BaseHTTPMiddleware):
         token_parts = token.split(".")
         if len(token_parts) != 3:
             logger.error(
-                f"Token does not have 3 parts (has {len(token_parts)}). This is not a valid JWT."
+                "Token does not have 3 parts (has %d). This is not a valid JWT.", len(token_parts)
             )
-            # Log the length of each part to help debug
-            for i, part in enumerate(token_parts):
-                logger.error(
-                    f"  Part {i}: length={len(part)}, preview={part[:20] if len(part) > 20 else part}..."
-                )
+            # Log the length of each part to help debug (skipped entirely unless DEBUG)
+            if logger.isEnabledFor(logging.DEBUG):
+                for i, part in enumerate(token_parts):
+                    logger.debug("  Part %d: length=%d, preview=%s...", i, len(part), part[:20])
             return JSONResponse(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 content={
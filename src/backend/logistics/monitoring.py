@@ -11,12 +11,26 @@ Environment variables:
 - OTEL_EXPORTER_OTLP_ENDPOINT: OTLP endpoint for Aspire Dashboard, Jaeger, etc. (for otlp mode)
 - ENABLE_CONSOLE_EXPORTERS: Set to "true" to enable console output (default: false)
 - ENABLE_SENSITIVE_DATA: Set to "true" to log prompts/responses (default: false)
+- ENABLE_HTTP_CLIENT_INSTRUMENTATION: Set to "true" to also trace requests/urllib3 calls
+  (appinsights mode, default: false; Azure SDK calls are already traced by azure_sdk)
+- ENABLE_TRACE_IDENTITY_SPAN_PROCESSOR: Set to "true" to stamp the request trace identity
+  on every span, including agent_framework and Azure SDK spans (default: false; only
+  spans started by this app carry it otherwise)
+- OTEL_BSP_*: OTLP batch span processor tuning (queue 8192, batch 1024, delay 1000ms)
+- OTEL_TRACES_SAMPLER / OTEL_TRACES_SAMPLER_ARG: Standard OTel head sampling, e.g.
+  "parentbased_traceidratio" with "0.1" to keep 10% of traces (otlp mode)
 """
 
 import logging
+import math
 import os
 from importlib import metadata
 
+from opentelemetry.sdk.trace import SpanProcessor
+
+from agents.tools.trace_helpers import identity_span_attributes, is_identity_span_processor_enabled
+from agents.utils import get_trace_identity
+
 logger = logging.getLogger(__name__)
 
 
@@ -99,6 +113,25 @@ def configure_observability() -> None:
         logger.error("Failed to configure OpenTelemetry: %s", e)
 
 
+class TraceIdentitySpanProcessor(SpanProcessor):
+    """Stamp the request trace identity on every span as it starts.
+
+    Spans created by agent_framework and the Azure SDK know nothing about the AG-UI
+    conversation; copying the TraceIdentity ContextVar onto each span correlates
+    them without patching the framework's span factories.
+    """
+
+    def on_start(self, span, parent_context=None) -> None:
+        attributes = identity_span_attributes(get_trace_identity())
+        if attributes:
+            span.set_attributes(attributes)
+
+
+def _identity_span_processors() -> list[SpanProcessor]:
+    """Span processors to register, per ENABLE_TRACE_IDENTITY_SPAN_PROCESSOR."""
+    return [TraceIdentitySpanProcessor()] if is_identity_span_processor_enabled() else []
+
+
 def _configure_azure_monitor(connection_string: str) -> None:
     """Configure Azure Monitor for production telemetry.
 
@@ -113,6 +146,11 @@ def _configure_azure_monitor(connection_string: str) -> None:
         )
 
         enable_sensitive = os.getenv("ENABLE_SENSITIVE_DATA", "false").lower() == "true"
+        # The Azure SDK already emits a span per Foundry call over requests/urllib3, so
+        # tracing those clients too doubles span volume; this app's own HTTP uses httpx.
+        trace_http_clients = (
+            os.getenv("ENABLE_HTTP_CLIENT_INSTRUMENTATION", "false").lower() == "true"
+        )
 
         # Create resource for Azure Monitor
         resource = create_resource()
@@ -124,11 +162,12 @@ def _configure_azure_monitor(connection_string: str) -> None:
             connection_string=connection_string,
             resource=resource,
             enable_live_metrics=True,
+            span_processors=_identity_span_processors(),
             instrumentation_options={
                 "azure_sdk": {"enabled": True},  # Trace Azure SDK calls (AI Foundry)
                 "fastapi": {"enabled": True},  # Trace FastAPI requests
-                "requests": {"enabled": True},  # Trace HTTP requests
-                "urllib3": {"enabled": True},  # Trace urllib3 requests
+                "requests": {"enabled": trace_http_clients},  # Trace HTTP requests
+                "urllib3": {"enabled": trace_http_clients},  # Trace urllib3 requests
             },
         )
 
@@ -154,6 +193,36 @@ def _configure_azure_monitor(connection_string: str) -> None:
         _configure_otlp_exporters()
 
 
+def _positive_env_int(name: str, default: int) -> int:
+    """Read a positive integer from the environment, falling back to default if unset or invalid."""
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        value = 0
+    if value <= 0:
+        logger.warning("Ignoring invalid %s=%r; using %s", name, raw, default)
+        return default
+    return value
+
+
+def _positive_env_float(name: str, default: float) -> float:
+    """Read a positive number from the environment, falling back to default if unset or invalid."""
+    raw = os.getenv(name)
+    if raw is None:
+        return default
+    try:
+        value = float(raw)
+    except ValueError:
+        value = 0.0
+    if not (math.isfinite(value) and value > 0):
+        logger.warning("Ignoring invalid %s=%r; using %s", name, raw, default)
+        return default
+    return value
+
+
 def _configure_otlp_exporters() -> None:
     """Configure OTLP exporters for local development (Aspire Dashboard, Jaeger, etc.)."""
     from agent_framework.observability import create_resource, enable_instrumentation
@@ -168,11 +237,27 @@ def _configure_otlp_exporters() -> None:
     # Create resource and tracer provider
     resource = create_resource()
     tracer_provider = TracerProvider(resource=resource)
+    for span_processor in _identity_span_processors():
+        tracer_provider.add_span_processor(span_processor)
 
     # Add OTLP exporter if endpoint is configured
     if otlp_endpoint:
         otlp_exporter = OTLPSpanExporter(endpoint=otlp_endpoint)
-        tracer_provider.add_span_processor(BatchSpanProcessor(otlp_exporter))
+        # SDK defaults (2048 queue, 512 batch, 5s delay) drop spans under bursty agent
+        # traffic and export in large spikes; OTEL_BSP_* env vars still take precedence.
+        # The batch is capped at the queue size, which the SDK otherwise rejects.
+        max_queue_size = _positive_env_int("OTEL_BSP_MAX_QUEUE_SIZE", 8192)
+        tracer_provider.add_span_processor(
+            BatchSpanProcessor(
+                otlp_exporter,
+                max_queue_size=max_queue_size,
+                max_export_batch_size=min(
+                    _positive_env_int("OTEL_BSP_MAX_EXPORT_BATCH_SIZE", 1024), max_queue_size
+                ),
+                schedule_delay_millis=_positive_env_float("OTEL_BSP_SCHEDULE_DELAY", 1000),
+                export_timeout_millis=_positive_env_float("OTEL_BSP_EXPORT_TIMEOUT", 10000),
+            )
+        )
 
     # Optionally add console exporter for debugging
     if os.getenv("ENABLE_CONSOLE_EXPORTERS", "false").lower() == "true":
@@ -11,7 +11,7 @@ Patches can be enabled/disabled via environment variables:
 Available patches:
 1. AG-UI Context Sync (legacy class patch) - optional global patch for
     AgentFrameworkAgent run entrypoints. Prefer instance-level wrapping via
-    attach_agui_context_sync() in agents/logistics_agent.py.
+    agui_request_context() in agents/logistics_agent.py.
 """
 
 from __future__ import annotations
@@ -19,6 +19,7 @@ from __future__ import annotations
 import logging
 import os
 from dataclasses import dataclass, field
+from typing import Final
 
 logger = logging.getLogger(__name__)
 
@@ -61,15 +62,12 @@ class PatchConfig:
         return config
 
 
-# Global config instance
-_config: PatchConfig | None = None
+# Global config instance (patches are applied on import, so load it eagerly)
+_config: Final[PatchConfig] = PatchConfig.from_environment()
 
 
 def get_config() -> PatchConfig:
     """Get the current patch configuration."""
-    global _config
-    if _config is None:
-        _config = PatchConfig.from_environment()
     return _config
 
 
@@ -88,9 +86,14 @@ def apply_all_patches() -> PatchConfig:
 
     config = get_config()
 
-    # Patch 1 (legacy): AG-UI Context Sync class patch
-    if config.agui_event_stream and apply_agui_event_stream_patch():
-        config.applied.append("agui_event_stream")
+    # (PatchConfig flag, apply function) pairs, applied in order
+    patches = (
+        # Patch 1 (legacy): AG-UI Context Sync class patch
+        ("agui_event_stream", apply_agui_event_stream_patch),
+    )
+    for name, apply_patch in patches:
+        if getattr(config, name) and apply_patch():
+            config.applied.append(name)
 
     if config.applied:
         logger.info("Applied patches: %s", config.applied)
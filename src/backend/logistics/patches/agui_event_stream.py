@@ -6,19 +6,38 @@ and backend tool execution context.
 Key responsibility:
 1. Sync activeFilter from AG-UI request context into current_active_filter
 
-Prefer instance-level wrapping via attach_agui_context_sync() instead of a
-global class monkey patch.
+Prefer instance-level wrapping instead of a global class monkey patch: the
+runner wrapper in agents/logistics_agent.py enters agui_request_context()
+alongside its tracing span, so each event crosses a single passthrough
+generator.
 """
 
 from __future__ import annotations
 
 import json
 import logging
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import Token
+from functools import cache
+from types import ModuleType
 from typing import Any, cast
 
 logger = logging.getLogger(__name__)
 
 
+@cache
+def _agent_utils() -> ModuleType:
+    """Return ``agents.utils``, importing it on first use.
+
+    A module-level import would be circular (agents imports this module), so
+    the import is deferred once instead of re-resolved on every AG-UI run.
+    """
+    import agents.utils
+
+    return agents.utils
+
+
 def _iter_context_items(input_data: dict[str, Any]) -> list[dict[str, Any]]:
     """Extract context entries from known AG-UI request shapes.
 
@@ -27,26 +46,31 @@ def _iter_context_items(input_data: dict[str, Any]) -> list[dict[str, Any]]:
     - {"input": {"context": [...]}} (wrapped shape)
     - {"context": {...}} / {"input": {"context": {...}}} (dict form)
     """
-    candidates = [
-        input_data.get("context"),
-        (input_data.get("input") or {}).get("context")
-        if isinstance(input_data.get("input"), dict)
-        else None,
-    ]
-
-    for candidate in candidates:
-        if isinstance(candidate, list):
-            return [item for item in candidate if isinstance(item, dict)]
-        if isinstance(candidate, dict):
-            return [candidate]
+    candidate = input_data.get("context")
+    if not isinstance(candidate, (list, dict)):
+        wrapped = input_data.get("input")
+        candidate = wrapped.get("context") if isinstance(wrapped, dict) else None
+
+    if isinstance(candidate, list):
+        return [item for item in candidate if isinstance(item, dict)]
+    if isinstance(candidate, dict):
+        return [candidate]
     return []
 
 
-def _parse_context_value(ctx_item: dict[str, Any]) -> dict[str, Any] | None:
-    """Parse a context entry value into a dict, if possible."""
+def _parse_context_value(
+    ctx_item: dict[str, Any], *, required_key: str | None = None
+) -> dict[str, Any] | None:
+    """Parse a context entry value into a dict, if possible.
+
+    With ``required_key``, JSON strings that cannot contain that key are
+    skipped without being decoded.
+    """
     raw_value = ctx_item.get("value", ctx_item)
 
     if isinstance(raw_value, str):
+        if required_key is not None and required_key not in raw_value:
+            return None
         try:
             parsed = json.loads(raw_value)
         except (json.JSONDecodeError, TypeError) as e:
@@ -64,26 +88,32 @@ def _parse_context_value(ctx_item: dict[str, Any]) -> dict[str, Any] | None:
     return None
 
 
-def _sync_active_filter(input_data: dict[str, Any]) -> None:
-    """Sync activeFilter from AG-UI context payload into ContextVar."""
-    from agents.utils import current_active_filter
+def _sync_active_filter(input_data: dict[str, Any]) -> Token | None:
+    """Sync activeFilter from AG-UI context payload into ContextVar.
+
+    Returns the ContextVar token when a value was written so the caller can
+    restore the previous filter once the run finishes.
+    """
+    current_active_filter = _agent_utils().current_active_filter
 
     context_list = _iter_context_items(input_data)
     if not context_list:
-        # Prevent stale filter bleed between turns when no context is sent.
-        current_active_filter.set(None)
+        # Fast path: no context sent. Prevent stale filter bleed between turns,
+        # but skip the ContextVar write when nothing is set.
+        if current_active_filter.get() is None:
+            return None
+        token = current_active_filter.set(None)
         logger.debug("[AGUI-CONTEXT] No context payload; cleared active filter")
-        return
+        return token
 
     found_active_filter = False
     latest_filter: dict[str, Any] | None = None
     saw_all_filter = False
 
-    for ctx_item in context_list:
-        if not isinstance(ctx_item, dict):
-            continue
-
-        ctx_value = _parse_context_value(ctx_item)
+    # Walk newest-first so only the latest activeFilter snapshot is parsed;
+    # _iter_context_items() only returns dict entries.
+    for ctx_item in reversed(context_list):
+        ctx_value = _parse_context_value(ctx_item, required_key="activeFilter")
         if not isinstance(ctx_value, dict) or "activeFilter" not in ctx_value:
             continue
 
@@ -92,14 +122,10 @@ def _sync_active_filter(input_data: dict[str, Any]) -> None:
         if not isinstance(filter_data, dict):
             continue
 
-        # Keep scanning to use the latest activeFilter in the payload.
-        # This avoids stale state when multiple readable snapshots exist.
         if filter_data.get("filterType") == "all":
             saw_all_filter = True
-            latest_filter = None
-            continue
+            break
 
-        saw_all_filter = False
         latest_filter = {
             "routeFrom": filter_data.get("routeFrom"),
             "routeTo": filter_data.get("routeTo"),
@@ -109,24 +135,25 @@ def _sync_active_filter(input_data: dict[str, Any]) -> None:
             "dateTo": filter_data.get("dateTo"),
             "limit": filter_data.get("limit"),
         }
+        break
 
-    if latest_filter is not None:
-        current_active_filter.set(latest_filter)
-        logger.debug(
-            "[AGUI-CONTEXT] Synced activeFilter to ContextVar: %s",
-            latest_filter,
-        )
-        return
+    if found_active_filter and latest_filter is None and not saw_all_filter:
+        return None
 
-    if saw_all_filter:
-        current_active_filter.set(None)
-        logger.debug("[AGUI-CONTEXT] Latest activeFilter.filterType=all; cleared active filter")
-        return
+    # Each run starts from a fresh context where the filter is unset, so only
+    # a clear-to-None can be a no-op; skip that write (and the token reset).
+    if latest_filter is None and current_active_filter.get() is None:
+        return None
 
-    if not found_active_filter:
-        # If context exists but doesn't include activeFilter, avoid stale state.
-        current_active_filter.set(None)
+    token = current_active_filter.set(latest_filter)
+    if latest_filter is not None:
+        logger.debug("[AGUI-CONTEXT] Synced activeFilter to ContextVar: %s", latest_filter)
+    elif saw_all_filter:
+        logger.debug("[AGUI-CONTEXT] Latest activeFilter.filterType=all; cleared active filter")
+    else:
+        # Context exists but doesn't include activeFilter; avoid stale state.
         logger.debug("[AGUI-CONTEXT] Context had no activeFilter; cleared active filter")
+    return token
 
 
 def _extract_conversation_id(input_data: dict[str, Any]) -> str | None:
@@ -153,73 +180,50 @@ def _extract_conversation_id(input_data: dict[str, Any]) -> str | None:
     return None
 
 
-def _sync_trace_identity(input_data: dict[str, Any]) -> None:
+def _sync_trace_identity(input_data: dict[str, Any]) -> Token | None:
     """Ensure TraceIdentity exists even when custom HTTP headers are absent."""
-    from agents.utils import TraceIdentity, get_trace_identity, set_trace_identity
-
-    identity = get_trace_identity()
+    utils = _agent_utils()
+    identity = utils.get_trace_identity()
     if identity and identity.conversation_id:
-        return
+        return None
 
     conversation_id = _extract_conversation_id(input_data)
     if not conversation_id:
-        return
+        return None
 
-    set_trace_identity(TraceIdentity(conversation_id=conversation_id))
+    token = utils.set_trace_identity(utils.TraceIdentity(conversation_id=conversation_id))
     logger.debug("[AGUI-CONTEXT] Synced trace identity conversation_id=%s", conversation_id)
+    return token
 
 
-def _apply_request_context(input_data: dict[str, Any]) -> None:
-    """Apply request context needed by backend tools."""
-    _sync_trace_identity(input_data)
-    _sync_active_filter(input_data)
-
+@contextmanager
+def agui_request_context(input_data: dict[str, Any]) -> Iterator[None]:
+    """Apply request context needed by backend tools for the duration of a run.
 
-def attach_agui_context_sync(agent_runner: object) -> bool:
-    """Attach context sync to a specific AG-UI protocol runner instance.
-
-    This is safer than globally monkey-patching the framework class. It wraps
-    the runner instance's AG-UI entry method (`run` or `run_agent`) and applies
-    context synchronization before delegating to the original implementation.
-
-    Args:
-        agent_runner: AgentFrameworkAgent instance (or compatible object)
-
-    Returns:
-        True if wrapper attached, False otherwise.
+    ContextVar writes are undone on exit so values from one AG-UI run cannot
+    leak into whatever the event loop schedules next on the same context.
     """
-    run_method_name = None
-    if callable(getattr(agent_runner, "run", None)):
-        run_method_name = "run"
-    elif callable(getattr(agent_runner, "run_agent", None)):
-        run_method_name = "run_agent"
-
-    if run_method_name is None:
-        logger.warning("[AGUI-CONTEXT] Could not attach context sync: no run/run_agent method")
-        return False
-
-    original_run = getattr(agent_runner, run_method_name)
-    if getattr(original_run, "_agui_context_sync_wrapped", False):
-        return True
-
-    async def wrapped_run(input_data: dict[str, Any]):
-        _apply_request_context(input_data)
-        async for event in original_run(input_data):
-            yield event
-
-    cast(Any, wrapped_run)._agui_context_sync_wrapped = True
-    setattr(agent_runner, run_method_name, wrapped_run)
-    logger.debug(
-        "[AGUI-CONTEXT] Attached instance context sync wrapper to %s",
-        run_method_name,
-    )
-    return True
+    utils = _agent_utils()
+    identity_token = _sync_trace_identity(input_data)
+    filter_token = _sync_active_filter(input_data)
+    try:
+        yield
+    finally:
+        # reset() raises ValueError if the generator is finalized from a
+        # different context (e.g. aclose() during shutdown); nothing to undo then.
+        try:
+            if filter_token is not None:
+                utils.current_active_filter.reset(filter_token)
+            if identity_token is not None:
+                utils.reset_trace_identity(identity_token)
+        except ValueError:
+            logger.debug("[AGUI-CONTEXT] Skipped context reset from a foreign context")
 
 
 def apply_agui_event_stream_patch() -> bool:
     """Backward-compatible global class patch.
 
-    Prefer attach_agui_context_sync() for instance-level wrapping.
+    Prefer entering agui_request_context() from an instance-level run wrapper.
 
     Returns:
         True if patch was applied, False otherwise.
@@ -242,9 +246,9 @@ def apply_agui_event_stream_patch() -> bool:
             return True
 
         async def patched_run(self, input_data: dict[str, Any]):
-            _apply_request_context(input_data)
-            async for event in original_run(self, input_data):
-                yield event
+            with agui_request_context(input_data):
+                async for event in original_run(self, input_data):
+                    yield event
 
         cast(Any, patched_run)._agui_context_sync_wrapped = True
         setattr(AgentFrameworkAgent, method_name, patched_run)
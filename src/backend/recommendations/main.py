@@ -285,7 +285,7 @@ class RecommendationsAgentExecutor(AgentExecutor):
                         user_message = text
                         break
 
-            logger.info(f"Received message: {user_message}")
+            logger.info("Received message: %s", user_message)
             span.set_attribute("a2a.message.length", len(user_message))
 
             try: